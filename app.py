@@ -3,13 +3,18 @@
 # A simple Streamlit app to remove known passwords from PDF files
 
 import streamlit as st
-from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2 import PdfReader
 import io
 import os
 import time
 import math
 import streamlit.components.v1 as components
 
+from job_queue import JobQueue, RESULT_TTL_SECONDS, STATUS_DONE, STATUS_QUEUED, STATUS_RUNNING
+from password_check import encode_password, params_from_reader
+from pdf_encrypt import ALGORITHMS, PERMISSION_BITS, EncryptionOptions
+from unlocker import build_unlocked_writer, count_pages, get_generated_filename, parse_page_selection
+
 # Optional: better preview
 try:
     import fitz  # PyMuPDF
@@ -23,6 +28,12 @@ WARN_FILE_SIZE_MB = 80
 DEFAULT_DPI = 120
 PREVIEW_WIDTH = 700
 
+# Queue mode: set UNLOCKER_QUEUE_DIR to a directory shared with worker.py
+# processes and this front end hands unlock jobs to them instead
+QUEUE_DIR = os.environ.get("UNLOCKER_QUEUE_DIR")
+QUEUE_TIMEOUT_S = 300
+QUEUE_POLL_S = 0.5
+
 st.set_page_config(
     page_title="PDF Unlocker",
     page_icon="🔓",
@@ -243,10 +254,51 @@ def format_file_size(size_bytes: int) -> float:
     """Convert bytes to MB with precision."""
     return size_bytes / 1_048_576
 
-def get_generated_filename(original_name: str) -> str:
-    """Generate clean output filename."""
-    base, ext = os.path.splitext(original_name)
-    return f"{base} - unlocked{ext}"
+def show_job_result(queue: JobQueue, job, key: str) -> None:
+    """Show status, stats and download for a queued job."""
+    result = queue.read_result(job["job_id"]) if job is not None else None
+    if job is None:
+        st.error("Unknown or expired job ID.")
+    elif job["status"] == STATUS_DONE and result is None:
+        st.error("This result has expired. Please upload the file again.")
+    elif job["status"] == STATUS_DONE:
+        pages = str(job["total_pages"]) if job["pages_out"] == job["total_pages"] else f"{job['pages_out']} of {job['total_pages']}"
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📄 Pages", pages)
+        with col2:
+            st.metric("⏱️ Time", f"{job['elapsed']:.1f}s")
+        with col3:
+            st.metric("📥 Original", f"{format_file_size(job['bytes_in']):.1f} MB")
+        with col4:
+            st.metric("📤 Unlocked", f"{format_file_size(job['bytes_out']):.1f} MB")
+        st.download_button(
+            label="✨ Download Unlocked PDF ✨",
+            data=result,
+            file_name=get_generated_filename(job["filename"]),
+            mime="application/pdf",
+            use_container_width=True,
+            key=f"download_{key}"
+        )
+    elif job["status"] in (STATUS_QUEUED, STATUS_RUNNING):
+        st.info(f"Job is still {job['status']}. Fetch it later with its job ID.")
+    else:
+        st.error(f"Could not process this PDF file: {job['error']}")
+
+def run_queued_unlock(uploaded_file, password: str, page_spec: str) -> None:
+    """Queue mode: hand the upload to the worker pool and wait for the result."""
+    with JobQueue(QUEUE_DIR) as queue:
+        job_id = queue.submit(uploaded_file.getvalue(), uploaded_file.name, password, page_spec.strip() or None)
+        st.caption(f"Job ID: `{job_id}`")
+        with st.spinner("Waiting for an unlock worker..."):
+            deadline = time.time() + QUEUE_TIMEOUT_S
+            job = queue.get(job_id)
+            while job["status"] in (STATUS_QUEUED, STATUS_RUNNING) and time.time() < deadline:
+                time.sleep(QUEUE_POLL_S)
+                job = queue.get(job_id)
+        if job["status"] == STATUS_DONE:
+            success_animation()
+        show_job_result(queue, job, key="queued")
 
 def share_section():
     """Display copy link button for sharing."""
@@ -356,6 +408,8 @@ with st.sidebar:
     st.markdown("""
     **Features**
     - Remove user or owner password
+    - Keep only selected pages (e.g. `1-5, 120`)
+    - Re-secure the output with a new password (AES-256)
     - First-page preview (if PyMuPDF installed)
     - Clean filename suggestions
     - Size & memory warnings
@@ -374,8 +428,24 @@ with st.sidebar:
     st.caption("Made with Streamlit • PyPDF2 • (optional) PyMuPDF")
 
 # ──── HOW TO USE SECTION ────────────────────────────────────────────────────
+if QUEUE_DIR:
+    password_note = "Your password is kept only until your file has been processed"
+    privacy_notes = f"""
+    - ✅ Files are processed by unlock workers on our servers
+    - ⚠️ Uploads are deleted once processed; unlocked files are kept for about
+      {RESULT_TTL_SECONDS // 60} minutes so they can be fetched by job ID, then deleted
+    - ⚠️ Anyone with the job ID can download the result until then — keep it private
+    - ✅ Use HTTPS connections for added security"""
+else:
+    password_note = "Your password is not stored anywhere"
+    privacy_notes = """
+    - ✅ Files are processed in memory for your browser session
+    - ✅ No files are stored on our servers
+    - ✅ All data is deleted after download or page refresh
+    - ✅ Use HTTPS connections for added security"""
+
 with st.expander("📖 How to Use This Tool", expanded=False):
-    st.markdown("""
+    st.markdown(f"""
     ### Step-by-Step Guide
     
     1. **Prepare Your PDF**
@@ -389,7 +459,9 @@ with st.expander("📖 How to Use This Tool", expanded=False):
     3. **Enter Your Password**
        - In the password field, enter the correct password
        - Password is **case-sensitive**
-       - Your password is not stored anywhere
+       - {password_note}
+       - Optionally list the pages to keep, e.g. `1-5, 120, 300-310`
+       - Optionally open "Re-secure output" to set a new password and permissions
     
     4. **Click "Remove Password"**
        - The app will decrypt the file
@@ -400,11 +472,7 @@ with st.expander("📖 How to Use This Tool", expanded=False):
        - Click "Download unlocked PDF"
        - The file will download as `[filename] - unlocked.pdf`
     
-    ### 🔒 Security & Privacy
-    - ✅ Files are processed locally in your browser session
-    - ✅ No files are stored on our servers
-    - ✅ All data is deleted after download or page refresh
-    - ✅ Use HTTPS connections for added security
+    ### 🔒 Security & Privacy{privacy_notes}
     
     ### ⚠️ Important Notes
     - This tool only removes password restrictions
@@ -431,6 +499,13 @@ st.markdown("<br>", unsafe_allow_html=True)
 # Show upload indicator
 animated_upload_indicator()
 
+if QUEUE_DIR:
+    with st.expander("🔎 Fetch a result by job ID", expanded=False):
+        lookup_id = st.text_input("Job ID", key="lookup_job_id").strip()
+        if lookup_id:
+            with JobQueue(QUEUE_DIR) as queue:
+                show_job_result(queue, queue.get(lookup_id), key="lookup")
+
 uploaded_file = st.file_uploader(
     "Upload your password-protected PDF",
     type=["pdf"],
@@ -461,7 +536,37 @@ if uploaded_file is not None:
         key="pdf_password"
     )
 
-    if st.button("🔓 Remove Password", type="primary", use_container_width=True, disabled=not password.strip()):
+    page_spec = st.text_input(
+        "Pages to keep (optional)",
+        placeholder="All pages — e.g. 1-5, 120, 300-310",
+        help="Only the content of the selected pages is decrypted and written, which is much faster for large documents",
+        key="pdf_pages"
+    )
+
+    # Re-securing happens in the same pass as unlocking; queue workers only unlock
+    encryption = None
+    encryption_invalid = False
+    if not QUEUE_DIR:
+        with st.expander("🔐 Re-secure output (optional)", expanded=False):
+            resecure = st.checkbox("Encrypt the output with a new password", key="resecure")
+            new_password = st.text_input("New open password", type="password", key="new_password",
+                                         help="Leave empty to let anyone open the file, with only the permissions below")
+            owner_password = st.text_input("New owner password", type="password", key="new_owner_password",
+                                           help="Needed to change permissions; defaults to the open password")
+            permissions = st.multiselect("Allowed actions", list(PERMISSION_BITS), default=list(PERMISSION_BITS),
+                                         key="new_permissions")
+            algorithm = st.selectbox("Encryption", ALGORITHMS, key="new_algorithm")
+        if resecure:
+            try:
+                encryption = EncryptionOptions(new_password, owner_password or None, permissions, algorithm)
+            except ValueError as e:
+                st.error(f"{e}.")
+                encryption_invalid = True
+
+    remove_clicked = st.button("🔓 Remove Password", type="primary", use_container_width=True, disabled=not password.strip() or encryption_invalid)
+    if remove_clicked and QUEUE_DIR:
+        run_queued_unlock(uploaded_file, password, page_spec)
+    elif remove_clicked:
         # Show processing animation
         processing_animation()
         
@@ -483,7 +588,7 @@ if uploaded_file is not None:
                 else:
                     processing_container.info("Attempting to decrypt with provided password...")
 
-                    decrypt_result = reader.decrypt(password)
+                    decrypt_result = reader.decrypt(encode_password(params_from_reader(reader), password))
 
                     if decrypt_result == 0:
                         processing_container.error("Decryption failed — incorrect password.")
@@ -499,22 +604,24 @@ if uploaded_file is not None:
                 # ─── Create clean PDF with animated progress ──
                 processing_container.info("Creating unprotected version...")
 
-                writer = PdfWriter()
+                total_pages = count_pages(reader)
+                try:
+                    page_indices = parse_page_selection(page_spec, total_pages)
+                except ValueError as e:
+                    processing_container.error(f"{e}.")
+                    st.stop()
 
-                total_pages = max(1, len(reader.pages))
                 progress = st.progress(0)
                 progress_text = st.empty()
 
-                for i, page in enumerate(reader.pages, 1):
-                    writer.add_page(page)
-                    percent = math.floor(i / total_pages * 100)
+                def show_page_progress(i: int, total: int) -> None:
+                    percent = math.floor(i / total * 100)
                     progress.progress(percent)
-                    progress_text.markdown(f"Adding page {i} of {total_pages} — {percent}%")
+                    progress_text.markdown(f"Adding page {i} of {total} — {percent}%")
 
-                try:
-                    writer.add_metadata(reader.metadata or {})
-                except Exception:
-                    pass
+                writer = build_unlocked_writer(
+                    reader, on_page=show_page_progress, page_indices=page_indices, encryption=encryption
+                )
 
                 # Write to memory
                 output = io.BytesIO()
@@ -528,11 +635,12 @@ if uploaded_file is not None:
                 progress_text.success("PDF creation complete")
 
                 # ─── Filename logic & stats ───────────────────
-                new_name = get_generated_filename(uploaded_file.name)
+                new_name = get_generated_filename(uploaded_file.name, "secured" if encryption else "unlocked")
 
                 orig_mb = format_file_size(uploaded_file.size)
                 out_mb = format_file_size(len(output.getvalue()))
-                pages = total_pages
+                selected_pages = len(page_indices)
+                pages = str(total_pages) if selected_pages == total_pages else f"{selected_pages} of {total_pages}"
 
                 # Show success animation
                 success_animation()
@@ -543,20 +651,20 @@ if uploaded_file is not None:
                 
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("📄 Pages", str(pages))
+                    st.metric("📄 Pages", pages)
                 with col2:
                     st.metric("⏱️ Time", f"{elapsed:.1f}s")
                 with col3:
                     st.metric("📥 Original", f"{orig_mb:.1f} MB")
                 with col4:
-                    st.metric("📤 Unlocked", f"{out_mb:.1f} MB")
+                    st.metric("📤 Secured" if encryption else "📤 Unlocked", f"{out_mb:.1f} MB")
 
                 # ─── Download button ─────────────────────────
                 st.markdown("<br>", unsafe_allow_html=True)
                 download_col1, download_col2, download_col3 = st.columns([1, 2, 1])
                 with download_col2:
                     st.download_button(
-                        label="✨ Download Unlocked PDF ✨",
+                        label="✨ Download Secured PDF ✨" if encryption else "✨ Download Unlocked PDF ✨",
                         data=output,
                         file_name=new_name,
                         mime="application/pdf",
@@ -570,6 +678,8 @@ if uploaded_file is not None:
                     try:
                         with st.expander("👁️ View First Page Preview", expanded=True):
                             doc = fitz.open(stream=output.getvalue(), filetype="pdf")
+                            if encryption:
+                                doc.authenticate(encryption.owner_password or encryption.user_password)
                             if len(doc) >= 1:
                                 pix = doc[0].get_pixmap(dpi=DEFAULT_DPI)
                                 preview_col1, preview_col2, preview_col3 = st.columns([1, 1, 1])
@@ -0,0 +1,149 @@
+# batch_unlock.py
+# Batch Unlock ────────────────────────────────────────────────────────────────
+# Unlock many PDFs from the command line. Progress is journaled to SQLite, so
+# re-running the same command after a crash skips everything already done.
+#
+#   python batch_unlock.py reports/*.pdf --out unlocked/ --password secret
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from job_journal import DEFAULT_JOURNAL_PATH, JobJournal, file_hash
+from password_check import add_password_arguments, load_passwords
+from pdf_encrypt import EncryptionOptions, add_encryption_arguments, encryption_from_args
+from unlocker import unique_output_names, unlock_file
+
+
+def collect_inputs(paths: List[str]) -> List[str]:
+    """
+    Expand directories (any .pdf/.PDF file in them) and globs (for shells that
+    don't) into PDF paths. Paths that match nothing are kept, so they fail
+    like any other unreadable input.
+    """
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputs.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(path, name))
+            ))
+        else:
+            inputs.extend(sorted(glob.glob(path)) or [path])
+    return inputs
+
+
+# Key stretching for the password fingerprint kept in the journal
+PASSWORD_FINGERPRINT_ITERATIONS = 200_000
+
+
+def _password_fingerprint(encryption: EncryptionOptions, salt: bytes) -> str:
+    # The journal must tell new passwords from old ones without storing them; a
+    # per-journal salt keeps one guessing run from applying to every journal
+    passwords = json.dumps([encryption.user_password, encryption.owner_password]).encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", passwords, salt, PASSWORD_FINGERPRINT_ITERATIONS).hex()
+
+
+def journal_options(
+    pages: Optional[str], encryption: Optional[EncryptionOptions] = None, salt: bytes = b""
+) -> str:
+    """
+    Options that change the output, as recorded in the journal; a rerun with
+    other options redoes the file. ``salt`` (the journal's) salts the
+    fingerprint of the new passwords.
+    """
+    options: Dict[str, Any] = {"pages": "".join((pages or "").split())}
+    if encryption:
+        options["encryption"] = {
+            "algorithm": encryption.algorithm,
+            "permissions": sorted(encryption.permissions) if encryption.permissions is not None else None,
+            "passwords": _password_fingerprint(encryption, salt),
+        }
+    return json.dumps(options, sort_keys=True)
+
+
+def run_batch(
+    inputs: List[str],
+    out_dir: str,
+    passwords: List[str],
+    journal: JobJournal,
+    pages: Optional[str] = None,
+    encryption: Optional[EncryptionOptions] = None,
+) -> int:
+    """
+    Unlock ``inputs`` into ``out_dir``, skipping those the journal has as done.
+    Returns the number of inputs that could not be read at all; they fail
+    before they have a content hash, so the journal has no row for them.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = "secured" if encryption else "unlocked"
+    options = journal_options(pages, encryption, journal.salt)
+    # Inputs from different directories may share a basename; never let one overwrite another
+    names = unique_output_names(inputs, suffix)
+    unreadable = 0
+    journal.start_run()
+    try:
+        for path, name in zip(inputs, names):
+            dst = os.path.join(out_dir, name)
+            try:
+                input_hash = file_hash(path)
+                bytes_in = os.path.getsize(path)
+            except OSError as e:
+                unreadable += 1
+                print(f"fail  {path}: {e}")
+                continue
+            if journal.is_done(input_hash, dst, options):
+                print(f"skip  {path} (already unlocked)")
+                continue
+
+            journal.mark_running(input_hash, path, dst, bytes_in, options)
+            try:
+                stats = unlock_file(path, dst, passwords, pages, encryption)
+            except Exception as e:
+                journal.mark_failed(input_hash, dst, f"{type(e).__name__}: {e}")
+                print(f"fail  {path}: {e}")
+                continue
+            journal.mark_done(input_hash, dst, stats["pages"], stats["bytes_out"], stats["elapsed"])
+            print(f"done  {path} → {dst} ({stats['pages']} pages, {stats['elapsed']:.1f}s)")
+    finally:
+        journal.finish_run()
+    return unreadable
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Remove known passwords from many PDF files.")
+    parser.add_argument("inputs", nargs="+", help="PDF files or directories")
+    parser.add_argument("--out", required=True, help="output directory")
+    add_password_arguments(parser)
+    parser.add_argument("--pages", help='pages to keep in every file, e.g. "1-5, 120"')
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="SQLite job journal path")
+    add_encryption_arguments(parser)
+    args = parser.parse_args()
+
+    passwords = load_passwords(args)
+    if not passwords:
+        parser.error("give at least one --password or a --password-file")
+    try:
+        encryption = encryption_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with JobJournal(args.journal) as journal:
+        unreadable = run_batch(collect_inputs(args.inputs), args.out, passwords, journal, args.pages, encryption)
+        summary = journal.summary()
+
+    failed = summary["failed"] + unreadable
+    print(
+        f"\nRun {summary['run_id']}: {summary['done']} done, {failed} failed, "
+        f"{summary['pages']} pages in {summary['wall_seconds']:.1f}s "
+        f"({summary['files_per_second']:.2f} files/s, {summary['mb_per_second']:.2f} MB/s)"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
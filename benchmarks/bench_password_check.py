@@ -0,0 +1,114 @@
+# benchmarks/bench_password_check.py
+# Password Check Benchmark ────────────────────────────────────────────────────
+# Candidates per second for PyPDF2's per-call decrypt path vs the batched
+# verifier in password_check.py, for each Standard security handler revision.
+#
+#   python benchmarks/bench_password_check.py --candidates 2000
+
+import argparse
+import hashlib
+import os
+import secrets
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PyPDF2._encryption import AlgV4, Encryption
+from PyPDF2.generic import ByteStringObject, DictionaryObject, NameObject, NumberObject
+
+import password_check
+
+USER_PASSWORD = "user-secret"
+OWNER_PASSWORD = "owner-secret"
+PERMISSIONS = -3904
+
+# revision → (V, key length in bits, crypt filter method)
+REVISIONS = {
+    2: (1, 40, None),
+    3: (2, 128, None),
+    4: (4, 128, "/AESV2"),
+    5: (5, 256, "/AESV3"),
+    6: (5, 256, "/AESV3"),
+}
+
+
+def make_encrypt_dict(revision: int):
+    """Build an /Encrypt dictionary (and first file ID) for the test passwords."""
+    version, bits, method = REVISIONS[revision]
+    first_id = secrets.token_bytes(16)
+    user, owner = USER_PASSWORD.encode(), OWNER_PASSWORD.encode()
+    p = PERMISSIONS & 0xFFFFFFFF
+
+    if revision <= 4:
+        rc4_key = AlgV4.compute_O_value_key(owner, revision, bits)
+        o = AlgV4.compute_O_value(rc4_key, user, revision)
+        key = AlgV4.compute_key(user, revision, bits, o, p, first_id, True)
+        u = AlgV4.compute_U_value(key, revision, first_id)
+    else:
+        hash_fn = password_check.hash_r6 if revision == 6 else (
+            lambda pw, salt, udata: hashlib.sha256(pw + salt + udata).digest()
+        )
+        u_salts, o_salts = secrets.token_bytes(16), secrets.token_bytes(16)
+        u = hash_fn(user, u_salts[:8], b"") + u_salts
+        o = hash_fn(owner, o_salts[:8], u[:48]) + o_salts
+
+    entry = DictionaryObject({
+        NameObject("/Filter"): NameObject("/Standard"),
+        NameObject("/V"): NumberObject(version),
+        NameObject("/R"): NumberObject(revision),
+        NameObject("/Length"): NumberObject(bits),
+        NameObject("/O"): ByteStringObject(o),
+        NameObject("/U"): ByteStringObject(u),
+        NameObject("/P"): NumberObject(PERMISSIONS),
+    })
+    if revision >= 5:
+        for name, size in (("/OE", 32), ("/UE", 32), ("/Perms", 16)):
+            entry[NameObject(name)] = ByteStringObject(bytes(size))
+    if method:
+        entry[NameObject("/CF")] = DictionaryObject({
+            NameObject("/StdCF"): DictionaryObject({NameObject("/CFM"): NameObject(method)})
+        })
+        entry[NameObject("/StmF")] = NameObject("/StdCF")
+        entry[NameObject("/StrF")] = NameObject("/StdCF")
+    return entry, first_id
+
+
+def bench_per_call(entry, first_id, candidates) -> float:
+    start = time.perf_counter()
+    for candidate in candidates:
+        Encryption.read(entry, first_id).verify(candidate)
+    return len(candidates) / (time.perf_counter() - start)
+
+
+def bench_batched(entry, first_id, candidates, processes) -> float:
+    start = time.perf_counter()
+    params = password_check.params_from_dict(entry, first_id)
+    found = password_check.find_password(params, candidates, processes)
+    elapsed = time.perf_counter() - start
+    assert found == (OWNER_PASSWORD, password_check.OWNER_PASSWORD), found
+    return len(candidates) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=2000,
+                        help="candidates per revision (R6 uses a tenth of this)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes for R3/R4/R6 (default: all CPUs)")
+    parser.add_argument("--revisions", type=int, nargs="+", default=sorted(REVISIONS))
+    args = parser.parse_args()
+
+    print(f"{'rev':>3}  {'candidates':>10}  {'decrypt() c/s':>14}  {'batched c/s':>12}  {'speedup':>7}")
+    for revision in args.revisions:
+        count = args.candidates // 10 if revision == 6 else args.candidates
+        candidates = [f"wrong-{i}" for i in range(count - 1)] + [OWNER_PASSWORD]
+        entry, first_id = make_encrypt_dict(revision)
+
+        per_call = bench_per_call(entry, first_id, candidates)
+        batched = bench_batched(entry, first_id, candidates, args.processes)
+        print(f"{revision:>3}  {count:>10}  {per_call:>14,.0f}  {batched:>12,.0f}  {batched / per_call:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_utils.py
+# Benchmark Helpers ───────────────────────────────────────────────────────────
+# Sample-document generation and memory measurement shared by the benchmarks.
+
+import hashlib
+import os
+import resource
+import struct
+
+from Crypto.Cipher import ARC4
+from PyPDF2._encryption import AlgV4
+
+PASSWORD = "bench"
+
+
+def peak_rss_mb() -> float:
+    """High-water RSS of this process (VmHWM), falling back to getrusage."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_pdf(path: str, size_mb: float, pages: int = 1, password: str = PASSWORD) -> None:
+    """
+    Encrypted (RC4-128) PDF with ``pages`` pages, the first carrying ``size_mb``
+    of incompressible image data. Written by hand because PyPDF2's writer
+    encrypts streams with pure-Python RC4, which is far too slow and
+    memory-hungry at this size.
+    """
+    first_id = os.urandom(16)
+    permissions = -3904
+    p = permissions & 0xFFFFFFFF
+    pw = password.encode()
+    o = AlgV4.compute_O_value(AlgV4.compute_O_value_key(pw, 3, 128), pw, 3)
+    key = AlgV4.compute_key(pw, 3, 128, o, p, first_id, True)
+    u = AlgV4.compute_U_value(key, 3, first_id)
+
+    image_id = 3
+    object_key = hashlib.md5(key + struct.pack("<i", image_id)[:3] + b"\0\0").digest()
+    image = ARC4.new(object_key).encrypt(os.urandom(int(size_mb * 1_048_576)))
+
+    first_page = 5
+    kids = b" ".join(b"%d 0 R" % (first_page + i) for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d /MediaBox [0 0 612 792] >>" % (kids, pages),
+        b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /Length %d >>\nstream\n" % len(image)
+        + image + b"\nendstream",
+        b"<< /Filter /Standard /V 2 /R 3 /Length 128 /O <%s> /U <%s> /P %d >>"
+        % (o.hex().encode(), u.hex().encode(), permissions),
+        b"<< /Type /Page /Parent 2 0 R /Resources << /XObject << /Im0 3 0 R >> >> >>",
+    ] + [b"<< /Type /Page /Parent 2 0 R >>"] * (pages - 1)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R /Encrypt 4 0 R /ID [<%s> <%s>] >>\n"
+                % (len(objects) + 1, first_id.hex().encode(), first_id.hex().encode()))
+        f.write(b"startxref\n%d\n%%%%EOF\n" % xref)
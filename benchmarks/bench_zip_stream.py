@@ -0,0 +1,92 @@
+# benchmarks/bench_zip_stream.py
+# Streaming ZIP Memory Benchmark ──────────────────────────────────────────────
+# Peak RSS of unlocking a batch into one ZIP, streamed (zip_stream.py) vs
+# built in BytesIO buffers. Each mode runs in its own subprocess so the peaks
+# don't mix. The default batch is 2 GB aggregate (32 × 64 MB PDFs).
+#
+#   python benchmarks/bench_zip_stream.py --total-mb 2048 --file-mb 64
+
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from PyPDF2 import PdfReader
+
+from bench_utils import PASSWORD, make_pdf, peak_rss_mb
+
+
+def run_stream(inputs, output: str, workers: int) -> None:
+    from zip_stream import iter_unlocked, iter_zip
+    with open(output, "wb") as out:
+        for chunk in iter_zip(iter_unlocked(inputs, [PASSWORD], workers)):
+            out.write(chunk)
+
+
+def run_bytesio(inputs, output: str, workers: int) -> None:
+    from unlocker import build_unlocked_writer
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zf:
+        for i, src in enumerate(inputs):
+            reader = PdfReader(src)
+            reader.decrypt(PASSWORD)
+            buffer = io.BytesIO()
+            build_unlocked_writer(reader).write(buffer)
+            zf.writestr(f"{i:06d}.pdf", buffer.getvalue())
+    with open(output, "wb") as out:
+        out.write(archive.getvalue())
+
+
+def child(mode: str, src: str, count: int, output: str, workers: int) -> None:
+    inputs = [src] * count
+    start = time.perf_counter()
+    (run_stream if mode == "stream" else run_bytesio)(inputs, output, workers)
+    elapsed = time.perf_counter() - start
+    own = peak_rss_mb()
+    workers_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024 if mode == "stream" else 0
+    print(f"{mode:>8}  {elapsed:>8.1f}s  {own:>10.0f} MB  {workers_peak:>12.0f} MB  "
+          f"{os.path.getsize(output) / 1_048_576:>10.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--total-mb", type=int, default=2048, help="aggregate size of the batch")
+    parser.add_argument("--file-mb", type=int, default=64, help="size of each input PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modes", nargs="+", default=["stream", "bytesio"],
+                        help="bytesio needs roughly 2× the aggregate size in RAM")
+    parser.add_argument("--child", nargs=4, metavar=("MODE", "SRC", "COUNT", "OUTPUT"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, src, count, output = args.child
+        child(mode, src, int(count), output, args.workers)
+        return
+
+    count = max(1, args.total_mb // args.file_mb)
+    with tempfile.TemporaryDirectory(prefix="bench-zip-") as tmp:
+        src = os.path.join(tmp, "input.pdf")
+        make_pdf(src, args.file_mb)
+        print(f"{count} × {args.file_mb} MB = {count * args.file_mb} MB aggregate, {args.workers} workers\n")
+        print(f"{'mode':>8}  {'time':>9}  {'peak RSS':>13}  {'worker peak':>15}  {'zip size':>13}")
+        for mode in args.modes:
+            output = os.path.join(tmp, f"{mode}.zip")
+            subprocess.run(
+                [sys.executable, __file__, "--workers", str(args.workers),
+                 "--child", mode, src, str(count), output],
+                check=True,
+            )
+            os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
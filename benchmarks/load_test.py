@@ -0,0 +1,312 @@
+# benchmarks/load_test.py
+# Load Test ───────────────────────────────────────────────────────────────────
+# Drives N simulated sessions of app.py through upload → password → Remove
+# Password → download with Streamlit's AppTest, all in this one process and
+# concurrently on threads, just as a single Streamlit server runs its sessions.
+# Reports throughput, p50/p95/p99 latency and peak RSS, and compares them
+# with a saved baseline.
+#
+#   python benchmarks/load_test.py --sessions 20 --concurrency 5 --mix small=6,medium=3,large=1
+#   python benchmarks/load_test.py ... --save-baseline    # record the current numbers
+#
+# Patches AppTest internals (see below), so it refuses to run on Streamlit
+# versions other than TESTED_STREAMLIT_VERSIONS.
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import streamlit
+from PyPDF2 import PdfReader
+from streamlit.runtime import Runtime
+from streamlit.runtime.media_file_storage import MediaFileStorageError
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest, app_test
+
+from bench_utils import PASSWORD, make_pdf, peak_rss_mb
+
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test.json")
+SESSION_TIMEOUT_S = 600
+
+# profile → (size in MB, pages)
+DOCUMENT_PROFILES = {
+    "small": (1, 10),
+    "medium": (10, 100),
+    "large": (40, 500),
+}
+
+REPORTED_METRICS = ("throughput_per_min", "p50_s", "p95_s", "p99_s", "unlock_p50_s", "unlock_p95_s", "peak_rss_mb")
+# For every reported metric except throughput, higher is worse
+LOWER_IS_WORSE = ("throughput_per_min",)
+# Exit code when the scenario has no saved baseline to compare against
+EXIT_NO_BASELINE = 2
+# Streamlit major.minor versions the AppTest patches below were verified on
+TESTED_STREAMLIT_VERSIONS = ("1.66",)
+
+
+def check_streamlit() -> None:
+    """Refuse to run on a Streamlit whose internals the patches below may not match."""
+    version = ".".join(streamlit.__version__.split(".")[:2])
+    missing = [
+        name for name, present in (
+            ("Runtime._instance", hasattr(Runtime, "_instance")),
+            ("app_test.Runtime", hasattr(app_test, "Runtime")),
+            ("app_test.MemoryMediaFileStorage", hasattr(app_test, "MemoryMediaFileStorage")),
+            ("MemoryMediaFileStorage.delete_file", hasattr(MemoryMediaFileStorage, "delete_file")),
+            ("MemoryMediaFileStorage.get_file", hasattr(MemoryMediaFileStorage, "get_file")),
+        )
+        if not present
+    ]
+    if version not in TESTED_STREAMLIT_VERSIONS or missing:
+        detail = f"; missing {', '.join(missing)}" if missing else ""
+        raise SystemExit(
+            f"load_test.py patches AppTest internals and is verified on Streamlit "
+            f"{', '.join(TESTED_STREAMLIT_VERSIONS)} only, not {streamlit.__version__}{detail}. "
+            f"Install a tested version (pip install 'streamlit=={TESTED_STREAMLIT_VERSIONS[-1]}.*'), "
+            f"or check the patches on this one and add it to TESTED_STREAMLIT_VERSIONS."
+        )
+
+
+class _PinFirstRuntime(type):
+    """
+    AppTest installs a fresh global mock runtime for every run and clears it
+    afterwards, so concurrent runs lose theirs mid-script (downloads then get
+    no URL). Keep the first one installed for all sessions instead, like the
+    single runtime of a real Streamlit server.
+    """
+
+    def __setattr__(cls, name: str, value: object) -> None:
+        if name == "_instance":
+            if value is not None and Runtime._instance is None:
+                Runtime._instance = value
+            return
+        super().__setattr__(name, value)
+
+
+class _PinnedRuntime(Runtime, metaclass=_PinFirstRuntime):
+    pass
+
+
+class _KeepFilesStorage(MemoryMediaFileStorage):
+    """
+    Sessions unlocking the same document produce byte-identical downloads that
+    share one media file, which another session's cleanup may delete before
+    run_session() reads it back. Keep them; there is one per distinct output.
+    Every instance is recorded so read_download() can find files without
+    reaching into the runtime's media file manager.
+    """
+
+    instances: List["_KeepFilesStorage"] = []
+
+    def __init__(self, media_endpoint: str) -> None:
+        super().__init__(media_endpoint)
+        _KeepFilesStorage.instances.append(self)
+
+    def delete_file(self, file_id: str) -> None:
+        pass
+
+
+def read_download(url: str) -> bytes:
+    """Contents of the media file behind a download button's URL."""
+    filename = os.path.basename(url)
+    for storage in _KeepFilesStorage.instances:
+        try:
+            return storage.get_file(filename).content
+        except MediaFileStorageError:
+            continue
+    raise LookupError(f"no media file for {url}")
+
+
+check_streamlit()
+app_test.Runtime = _PinnedRuntime
+app_test.MemoryMediaFileStorage = _KeepFilesStorage
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse a weighted mix like "small=6,medium=3,large=1"."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DOCUMENT_PROFILES:
+            raise SystemExit(f"Unknown document profile '{name}' (use {', '.join(DOCUMENT_PROFILES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+# ──── ONE SESSION ───────────────────────────────────────────────────────────
+def run_session(name: str, data: bytes, pages: int) -> Dict[str, float]:
+    """Upload, enter the password, click Remove Password and check the downloaded PDF."""
+    start = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=SESSION_TIMEOUT_S)
+    at.run()
+    at.file_uploader[0].upload(name, data, "application/pdf")
+    at.run()
+    at.text_input(key="pdf_password").input(PASSWORD)
+    at.run()
+
+    clicked = time.perf_counter()
+    next(b for b in at.button if "Remove Password" in b.label).click()
+    at.run()
+    finished = time.perf_counter()
+
+    if at.exception or at.error:
+        problems = [e.value for e in at.exception] + [e.value for e in at.error]
+        raise RuntimeError(f"{name}: {problems}")
+    downloads = at.get("download_button")
+    if not downloads:
+        raise RuntimeError(f"{name}: no download offered")
+    reader = PdfReader(io.BytesIO(read_download(downloads[0].proto.url)))
+    if reader.is_encrypted or len(reader.pages) != pages:
+        raise RuntimeError(f"{name}: download is not an unlocked {pages}-page PDF")
+    return {"flow_s": finished - start, "unlock_s": finished - clicked}
+
+
+# ──── LOAD TEST ─────────────────────────────────────────────────────────────
+def run_load_test(sessions: int, concurrency: int, mix: Dict[str, float], seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    profiles = rng.choices(list(mix), weights=list(mix.values()), k=sessions)
+
+    with tempfile.TemporaryDirectory(prefix="load-test-") as tmp:
+        documents = {}
+        for profile in set(profiles):
+            size_mb, pages = DOCUMENT_PROFILES[profile]
+            path = os.path.join(tmp, f"{profile}.pdf")
+            make_pdf(path, size_mb, pages)
+            with open(path, "rb") as f:
+                documents[profile] = f.read()
+
+    results: List[Dict[str, float]] = []
+    failures: List[str] = []
+    lock = threading.Lock()
+
+    def session(i: int) -> None:
+        profile = profiles[i]
+        try:
+            result = run_session(f"{profile}-{i}.pdf", documents[profile], DOCUMENT_PROFILES[profile][1])
+        except Exception as e:
+            with lock:
+                failures.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            results.append(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(session, range(sessions)))
+    wall = time.perf_counter() - start
+
+    for failure in failures:
+        print(f"fail  {failure}", file=sys.stderr)
+    flow = [r["flow_s"] for r in results]
+    unlock = [r["unlock_s"] for r in results]
+    return {
+        "sessions": sessions,
+        "failed": len(failures),
+        "wall_s": wall,
+        "throughput_per_min": len(results) / wall * 60 if wall else 0.0,
+        "p50_s": percentile(flow, 50),
+        "p95_s": percentile(flow, 95),
+        "p99_s": percentile(flow, 99),
+        "unlock_p50_s": percentile(unlock, 50),
+        "unlock_p95_s": percentile(unlock, 95),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ──── BASELINES ─────────────────────────────────────────────────────────────
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(scenario: str, report: Dict[str, float]) -> None:
+    baselines = load_baselines()
+    baselines[scenario] = report
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(report: Dict[str, float], baseline: Optional[Dict[str, float]], tolerance: float) -> List[str]:
+    """Print report vs baseline; return the metrics that regressed beyond ``tolerance``."""
+    regressions = []
+    print(f"\n{'metric':<20}{'current':>12}{'baseline':>12}{'change':>10}")
+    for metric in REPORTED_METRICS:
+        current = report[metric]
+        if not baseline or not baseline.get(metric):
+            print(f"{metric:<20}{current:>12.2f}{'—':>12}{'':>10}")
+            continue
+        change = (current - baseline[metric]) / baseline[metric]
+        worse = change < -tolerance if metric in LOWER_IS_WORSE else change > tolerance
+        flag = "  ✗" if worse else ""
+        print(f"{metric:<20}{current:>12.2f}{baseline[metric]:>12.2f}{change:>+9.0%}{flag}")
+        if worse:
+            regressions.append(metric)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test app.py with simulated concurrent sessions.")
+    parser.add_argument("--sessions", type=int, default=20, help="total sessions to run")
+    parser.add_argument("--concurrency", type=int, default=5, help="sessions in flight at once")
+    parser.add_argument("--mix", default="small=6,medium=3,large=1",
+                        help=f"weighted document mix; profiles: {', '.join(DOCUMENT_PROFILES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenario", help="baseline name (default: derived from the options)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the scenario's baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    scenario = args.scenario or f"{args.sessions}x{args.concurrency}:{args.mix}"
+    print(f"Scenario {scenario}")
+    report = run_load_test(args.sessions, args.concurrency, mix, args.seed)
+    print(f"{report['sessions'] - report['failed']} of {report['sessions']} sessions completed "
+          f"in {report['wall_s']:.1f}s")
+
+    if args.save_baseline:
+        compare(report, None, args.tolerance)
+        save_baseline(scenario, report)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+        return 1 if report["failed"] else 0
+
+    baseline = load_baselines().get(scenario)
+    if baseline is None:
+        compare(report, None, args.tolerance)
+        print(f"\nNO BASELINE for scenario {scenario} in {BASELINE_PATH}; nothing was checked. "
+              f"Record one on the reference machine with --save-baseline.", file=sys.stderr)
+        return EXIT_NO_BASELINE
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+    return 1 if regressions or report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
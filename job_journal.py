@@ -0,0 +1,188 @@
+# job_journal.py
+# Job Journal ─────────────────────────────────────────────────────────────────
+# Durable SQLite record of every input in a batch (content hash, status,
+# output path, timings) so an interrupted batch resumes where it stopped.
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+# ──── CONSTANTS ─────────────────────────────────────────────────────────────
+DEFAULT_JOURNAL_PATH = "unlock_journal.sqlite3"
+HASH_CHUNK_SIZE = 1_048_576
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    started     REAL NOT NULL,
+    finished    REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    input_hash  TEXT NOT NULL,
+    input_path  TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    options     TEXT NOT NULL DEFAULT '',
+    run_id      INTEGER REFERENCES runs(run_id),
+    started     REAL,
+    finished    REAL,
+    elapsed     REAL,
+    pages       INTEGER,
+    bytes_in    INTEGER,
+    bytes_out   INTEGER,
+    error       TEXT,
+    PRIMARY KEY (input_hash, output_path)
+);
+"""
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class JobJournal:
+    """
+    One row per (content hash, output path). Every state change is committed
+    before the next input starts; the WAL journal mode keeps committed rows
+    safe across a crash or pod eviction. ``salt`` is random per journal, for
+    callers that record secrets in ``options`` only as salted hashes.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(_SCHEMA)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('salt', ?)", (os.urandom(16).hex(),)
+            )
+        self.salt = bytes.fromhex(
+            self.conn.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()["value"]
+        )
+        self.run_id: Optional[int] = None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "JobJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ──── Runs ──────────────────────────────────────────────────────────────
+    def start_run(self) -> int:
+        with self.conn:
+            cur = self.conn.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),))
+        self.run_id = cur.lastrowid
+        return self.run_id
+
+    def finish_run(self) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished = ? WHERE run_id = ?", (time.time(), self.run_id)
+            )
+
+    # ──── Items ─────────────────────────────────────────────────────────────
+    def is_done(self, input_hash: str, output_path: str, options: str = "") -> bool:
+        """
+        True if this content was already written to ``output_path`` with the
+        same ``options`` (an opaque string, e.g. the page selection) and the
+        file is still there.
+        """
+        row = self.conn.execute(
+            "SELECT status, options FROM items WHERE input_hash = ? AND output_path = ?",
+            (input_hash, output_path),
+        ).fetchone()
+        return (
+            row is not None and row["status"] == STATUS_DONE and row["options"] == options
+            and os.path.exists(output_path)
+        )
+
+    def mark_running(
+        self, input_hash: str, input_path: str, output_path: str, bytes_in: int, options: str = ""
+    ) -> None:
+        """Record that work on an input has started (overwrites failed/crashed/outdated attempts)."""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO items (input_hash, input_path, status, output_path, options, run_id, started, bytes_in)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(input_hash, output_path) DO UPDATE SET
+                    input_path = excluded.input_path, status = excluded.status, options = excluded.options,
+                    run_id = excluded.run_id, started = excluded.started, bytes_in = excluded.bytes_in,
+                    finished = NULL, elapsed = NULL, pages = NULL, bytes_out = NULL, error = NULL
+                """,
+                (input_hash, input_path, STATUS_RUNNING, output_path, options, self.run_id, time.time(), bytes_in),
+            )
+
+    def mark_done(self, input_hash: str, output_path: str, pages: int, bytes_out: int, elapsed: float) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE items SET status = ?, finished = ?, elapsed = ?, pages = ?, bytes_out = ?
+                WHERE input_hash = ? AND output_path = ?
+                """,
+                (STATUS_DONE, time.time(), elapsed, pages, bytes_out, input_hash, output_path),
+            )
+
+    def mark_failed(self, input_hash: str, output_path: str, error: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE items SET status = ?, finished = ?, error = ? WHERE input_hash = ? AND output_path = ?",
+                (STATUS_FAILED, time.time(), error, input_hash, output_path),
+            )
+
+    # ──── Reporting ─────────────────────────────────────────────────────────
+    def summary(self, run_id: Optional[int] = None) -> Dict[str, Any]:
+        """Counts and throughput for one run (default: the current run)."""
+        run_id = run_id if run_id is not None else self.run_id
+        run = self.conn.execute(
+            "SELECT started, finished FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        counts = {
+            row["status"]: row["n"]
+            for row in self.conn.execute(
+                "SELECT status, COUNT(*) AS n FROM items WHERE run_id = ? GROUP BY status", (run_id,)
+            )
+        }
+        totals = self.conn.execute(
+            """
+            SELECT COUNT(*) AS files, COALESCE(SUM(pages), 0) AS pages,
+                   COALESCE(SUM(bytes_in), 0) AS bytes_in, COALESCE(SUM(elapsed), 0) AS busy
+            FROM items WHERE run_id = ? AND status = ?
+            """,
+            (run_id, STATUS_DONE),
+        ).fetchone()
+
+        wall = ((run["finished"] or time.time()) - run["started"]) if run else 0.0
+        return {
+            "run_id": run_id,
+            "done": counts.get(STATUS_DONE, 0),
+            "failed": counts.get(STATUS_FAILED, 0),
+            "running": counts.get(STATUS_RUNNING, 0),
+            "pages": totals["pages"],
+            "bytes_in": totals["bytes_in"],
+            "wall_seconds": wall,
+            "busy_seconds": totals["busy"],
+            "files_per_second": totals["files"] / wall if wall else 0.0,
+            "mb_per_second": totals["bytes_in"] / 1_048_576 / wall if wall else 0.0,
+        }
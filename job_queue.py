@@ -0,0 +1,257 @@
+# job_queue.py
+# Job Queue & Result Store ────────────────────────────────────────────────────
+# Lets front ends hand unlock work to separate worker processes on the same
+# host. Everything lives under one local directory:
+#
+#   queue.sqlite3        job rows (status, timings, result key)
+#   inputs/<sha256>.pdf  uploaded PDFs, keyed by content hash
+#   results/<key>.pdf    unlocked PDFs, keyed by input hash + page selection
+#
+# Front ends submit() and poll get() by job ID; workers claim() jobs and
+# cleanup() finished jobs and their results once they are RESULT_TTL_SECONDS old.
+
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# ──── CONSTANTS ─────────────────────────────────────────────────────────────
+QUEUE_DB_NAME = "queue.sqlite3"
+# A running job whose worker has not called renew() for this long is
+# assumed dead and handed out again
+LEASE_SECONDS = 600
+# Finished jobs, and results no other job needs, are deleted after this long
+RESULT_TTL_SECONDS = int(os.environ.get("UNLOCKER_RESULT_TTL_S", 3600))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    filename    TEXT NOT NULL,
+    input_hash  TEXT NOT NULL,
+    result_key  TEXT NOT NULL,
+    pages       TEXT,
+    password    TEXT,
+    worker      TEXT,
+    created     REAL NOT NULL,
+    claimed     REAL,
+    heartbeat   REAL,
+    finished    REAL,
+    elapsed     REAL,
+    pages_out   INTEGER,
+    total_pages INTEGER,
+    bytes_in    INTEGER,
+    bytes_out   INTEGER,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+
+def result_key(input_hash: str, pages: Optional[str]) -> str:
+    """Result store key: same input + same page selection → same unlocked PDF."""
+    selection = "".join((pages or "").split())
+    return hashlib.sha256(f"{input_hash}\0{selection}".encode()).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class JobQueue:
+    """
+    SQLite-backed stand-in for a real queue; safe for many processes on one
+    host. Single-host only: WAL mode needs shared memory, so the directory
+    must not be on a network filesystem. Use a real queue and object store
+    to spread workers over several nodes.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.inputs_dir = os.path.join(root, "inputs")
+        self.results_dir = os.path.join(root, "results")
+        os.makedirs(self.inputs_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(root, QUEUE_DB_NAME), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Write transaction; also serializes input-file writes and deletes."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ──── Paths ─────────────────────────────────────────────────────────────
+    def input_path(self, input_hash: str) -> str:
+        return os.path.join(self.inputs_dir, f"{input_hash}.pdf")
+
+    def result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, f"{key}.pdf")
+
+    def has_result(self, key: str) -> bool:
+        return os.path.exists(self.result_path(key))
+
+    # ──── Front end side ────────────────────────────────────────────────────
+    def submit(self, data: bytes, filename: str, password: str, pages: Optional[str] = None) -> str:
+        """Store the upload by content hash and queue a job for it. Returns the job ID."""
+        input_hash = hashlib.sha256(data).hexdigest()
+        path = self.input_path(input_hash)
+        job_id = uuid.uuid4().hex
+        with self._transaction():
+            if not os.path.exists(path):
+                _write_atomic(path, data)
+            self.conn.execute(
+                """
+                INSERT INTO jobs (job_id, status, filename, input_hash, result_key, pages, password, created, bytes_in)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, STATUS_QUEUED, filename, input_hash, result_key(input_hash, pages),
+                 pages, password, time.time(), len(data)),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status and stats (never the password), or None for an unknown ID."""
+        row = self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("password")
+        return job
+
+    def read_result(self, job_id: str) -> Optional[bytes]:
+        """The unlocked PDF of a finished job, or None (unknown, pending, failed or expired)."""
+        job = self.get(job_id)
+        if job is None or job["status"] != STATUS_DONE:
+            return None
+        try:
+            with open(self.result_path(job["result_key"]), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # ──── Worker side ───────────────────────────────────────────────────────
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued (or lease-expired) job, including its password."""
+        now = time.time()
+        with self._transaction():
+            row = self.conn.execute(
+                """
+                SELECT * FROM jobs
+                WHERE status = ? OR (status = ? AND COALESCE(heartbeat, claimed) < ?)
+                ORDER BY created LIMIT 1
+                """,
+                (STATUS_QUEUED, STATUS_RUNNING, now - LEASE_SECONDS),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, claimed = ?, heartbeat = ? WHERE job_id = ?",
+                    (STATUS_RUNNING, worker, now, now, row["job_id"]),
+                )
+        return dict(row) if row is not None else None
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend the lease on a running job. False if the job is no longer this worker's."""
+        with self._transaction():
+            updated = self.conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE job_id = ? AND worker = ? AND status = ?",
+                (time.time(), job_id, worker, STATUS_RUNNING),
+            ).rowcount
+        return bool(updated)
+
+    def complete(self, job_id: str, stats: Dict[str, Any]) -> None:
+        self._finish(
+            job_id,
+            "status = ?, elapsed = ?, pages_out = ?, total_pages = ?, bytes_out = ?",
+            (STATUS_DONE, stats["elapsed"], stats["pages"], stats["total_pages"], stats["bytes_out"]),
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, "status = ?, error = ?", (STATUS_FAILED, error))
+
+    def cleanup(self, max_age: float = RESULT_TTL_SECONDS) -> int:
+        """
+        Delete jobs that finished more than ``max_age`` seconds ago, every
+        result file no remaining job refers to, and every partial result
+        (``<key>.pdf.<id>.part``) no pending job is still writing, e.g. one left
+        by a killed worker. Returns the number of jobs deleted.
+        """
+        with self._transaction():
+            deleted = self.conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                (STATUS_DONE, STATUS_FAILED, time.time() - max_age),
+            ).rowcount
+            keep = {row[0] for row in self.conn.execute("SELECT DISTINCT result_key FROM jobs")}
+            writing = {
+                row[0] for row in self.conn.execute(
+                    "SELECT DISTINCT result_key FROM jobs WHERE status IN (?, ?)",
+                    (STATUS_QUEUED, STATUS_RUNNING),
+                )
+            }
+            for name in os.listdir(self.results_dir):
+                key = name.split(".", 1)[0]
+                if name.endswith(".part"):
+                    if key not in writing:
+                        _remove(os.path.join(self.results_dir, name))
+                elif name.endswith(".pdf") and key not in keep:
+                    _remove(os.path.join(self.results_dir, name))
+        return deleted
+
+    def _finish(self, job_id: str, assignments: str, values: tuple) -> None:
+        with self._transaction():
+            # The password is only needed while the job is pending
+            self.conn.execute(
+                f"UPDATE jobs SET {assignments}, finished = ?, password = NULL WHERE job_id = ?",
+                (*values, time.time(), job_id),
+            )
+            # Drop the upload once no pending job needs it
+            input_hash = self.conn.execute(
+                "SELECT input_hash FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()["input_hash"]
+            pending = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE input_hash = ? AND status IN (?, ?)",
+                (input_hash, STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchone()[0]
+            if not pending:
+                _remove(self.input_path(input_hash))
@@ -0,0 +1,342 @@
+# password_check.py
+# Batched Password Verification ───────────────────────────────────────────────
+# Check many candidate passwords against a single parsed /Encrypt dictionary
+# without going through PdfReader.decrypt() once per candidate.
+
+import argparse
+import hashlib
+import os
+import struct
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Iterable, List, Optional, Sequence, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.errors import DependencyError
+
+# Optional: fast RC4 / AES (also what PyPDF2 uses for AES documents)
+try:
+    from Crypto.Cipher import AES, ARC4
+    HAS_CRYPTODOME = True
+except ImportError:
+    HAS_CRYPTODOME = False
+
+# ──── CONSTANTS ─────────────────────────────────────────────────────────────
+# Same values as PyPDF2's PasswordType, so results can be used interchangeably
+NOT_DECRYPTED = 0
+USER_PASSWORD = 1
+OWNER_PASSWORD = 2
+
+# Below this many candidates, starting a process pool costs more than it saves
+PARALLEL_MIN_CANDIDATES = 64
+# Revisions whose per-candidate cost is high enough to spread over processes
+# (R3/R4: 50 MD5 rounds + 20 RC4 rounds per check, R6: SHA-2/AES rounds)
+PARALLEL_REVISIONS = (3, 4, 6)
+# find_password() hands out candidates in chunks this size, one per process at
+# a time, so a match stops the search within about one chunk per process
+SEARCH_CHUNK_SIZE = 16
+
+_PADDING = bytes.fromhex(
+    "28BF4E5E4E758A4164004E56FFFA0108"
+    "2E2E00B6D0683E802F0CA9FE6453697A"
+)
+# Byte-translation tables for the key XOR of the 19/20 RC4 rounds (revision 3+)
+_XOR_TABLES = [bytes(b ^ i for b in range(256)) for i in range(20)]
+
+
+@dataclass(frozen=True)
+class EncryptParams:
+    """Values of a Standard security handler needed to check passwords."""
+    revision: int
+    key_length: int
+    o: bytes
+    u: bytes
+    p: int
+    first_id: bytes
+    encrypt_metadata: bool = True
+
+
+# ──── PARSING ───────────────────────────────────────────────────────────────
+def _raw_bytes(value) -> bytes:
+    value = value.get_object()
+    return getattr(value, "original_bytes", value)
+
+
+def params_from_dict(encrypt, first_id: bytes) -> EncryptParams:
+    """Build EncryptParams from an /Encrypt dictionary and the first file ID."""
+    encrypt = encrypt.get_object()
+    if encrypt.get("/Filter") != "/Standard":
+        raise NotImplementedError("only Standard PDF encryption handler is available")
+
+    revision = int(encrypt["/R"])
+    if revision >= 5:
+        key_length = 32
+    elif revision == 2:
+        key_length = 5
+    else:
+        key_length = int(encrypt.get("/Length", 40)) // 8
+
+    metadata = encrypt.get("/EncryptMetadata")
+    return EncryptParams(
+        revision=revision,
+        key_length=key_length,
+        o=_raw_bytes(encrypt["/O"]),
+        u=_raw_bytes(encrypt["/U"]),
+        p=int(encrypt["/P"]) & 0xFFFFFFFF,
+        first_id=first_id,
+        encrypt_metadata=bool(metadata.value) if metadata is not None else True,
+    )
+
+
+def params_from_reader(reader: PdfReader) -> EncryptParams:
+    """Build EncryptParams from an encrypted PdfReader (no decrypt needed)."""
+    if not reader.is_encrypted:
+        raise ValueError("PDF is not encrypted")
+    trailer = reader.trailer
+    ids = trailer.get("/ID")
+    first_id = _raw_bytes(ids.get_object()[0]) if ids else b""
+    return params_from_dict(trailer["/Encrypt"], first_id)
+
+
+# ──── PRIMITIVES ────────────────────────────────────────────────────────────
+def _rc4(key: bytes, data: bytes) -> bytes:
+    if HAS_CRYPTODOME:
+        return ARC4.new(key).encrypt(data)
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+    out = bytearray(len(data))
+    i = j = 0
+    for k, byte in enumerate(data):
+        i = (i + 1) & 0xFF
+        j = (j + s[i]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+        out[k] = byte ^ s[(s[i] + s[j]) & 0xFF]
+    return bytes(out)
+
+
+def _encode_legacy(password: str) -> bytes:
+    # Same encoding rule as PyPDF2's Encryption.verify()
+    try:
+        return password.encode("latin-1")
+    except UnicodeEncodeError:
+        return password.encode("utf-8")
+
+
+def encode_aes_password(password: str) -> bytes:
+    """Revision 5/6 password bytes: UTF-8, truncated to 127 (SASLprep is skipped, as in PyPDF2)."""
+    return password.encode("utf-8")[:127]
+
+
+def encode_password(params: EncryptParams, password: str) -> bytes:
+    """
+    The bytes a candidate is checked as. Pass these to PdfReader.decrypt():
+    given a str, it tries Latin-1 first even for revision 5/6 documents.
+    """
+    if params.revision >= 5:
+        return encode_aes_password(password)
+    return _encode_legacy(password)
+
+
+# ──── REVISION 2–4 (RC4 / AES-128) ──────────────────────────────────────────
+class _LegacyChecker:
+    """Algorithms 2, 6 and 7 with every password-independent part precomputed."""
+
+    def __init__(self, params: EncryptParams) -> None:
+        self.rev = params.revision
+        self.n = params.key_length
+        self.o = params.o
+        self.u = params.u if self.rev == 2 else params.u[:16]
+        suffix = params.o + struct.pack("<I", params.p) + params.first_id
+        if self.rev >= 4 and not params.encrypt_metadata:
+            suffix += b"\xff\xff\xff\xff"
+        self.key_suffix = suffix
+        self.u_seed = hashlib.md5(_PADDING + params.first_id).digest()
+
+    def check_user(self, password: bytes) -> bool:
+        n = self.n
+        md5 = hashlib.md5
+        digest = md5((password + _PADDING)[:32] + self.key_suffix).digest()
+        if self.rev == 2:
+            return _rc4(digest[:5], _PADDING) == self.u
+        for _ in range(50):
+            digest = md5(digest[:n]).digest()
+        key = digest[:n]
+        value = _rc4(key, self.u_seed)
+        for i in range(1, 20):
+            value = _rc4(key.translate(_XOR_TABLES[i]), value)
+        return value == self.u
+
+    def check_owner(self, password: bytes) -> bool:
+        md5 = hashlib.md5
+        digest = md5((password + _PADDING)[:32]).digest()
+        if self.rev == 2:
+            return self.check_user(_rc4(digest[:5], self.o))
+        for _ in range(50):
+            digest = md5(digest).digest()
+        key = digest[:self.n]
+        user_password = self.o
+        for i in range(19, -1, -1):
+            user_password = _rc4(key.translate(_XOR_TABLES[i]), user_password)
+        return self.check_user(user_password)
+
+    def check(self, candidate: str) -> int:
+        password = _encode_legacy(candidate)
+        if self.check_owner(password):
+            return OWNER_PASSWORD
+        if self.check_user(password):
+            return USER_PASSWORD
+        return NOT_DECRYPTED
+
+
+# ──── REVISION 5–6 (AES-256) ────────────────────────────────────────────────
+def hash_r6(password: bytes, salt: bytes, udata: bytes) -> bytes:
+    """Algorithm 2.B: the iterated SHA-2/AES hash used by revision 6."""
+    k = hashlib.sha256(password + salt + udata).digest()
+    hashes = (hashlib.sha256, hashlib.sha384, hashlib.sha512)
+    count = 0
+    while True:
+        count += 1
+        e = AES.new(k[:16], AES.MODE_CBC, k[16:32]).encrypt((password + k + udata) * 64)
+        k = hashes[sum(e[:16]) % 3](e).digest()
+        if count >= 64 and e[-1] <= count - 32:
+            return k[:32]
+
+
+class _AesV3Checker:
+    """Algorithms 11 and 12 (owner/user authentication, revision 5 and 6)."""
+
+    def __init__(self, params: EncryptParams) -> None:
+        if params.revision >= 6 and not HAS_CRYPTODOME:
+            raise DependencyError("PyCryptodome is required for AES algorithm")
+        self.rev = params.revision
+        self.o_hash, self.o_salt = params.o[:32], params.o[32:40]
+        self.u_hash, self.u_salt = params.u[:32], params.u[32:40]
+        self.u48 = params.u[:48]
+
+    def _hash(self, password: bytes, salt: bytes, udata: bytes) -> bytes:
+        if self.rev >= 6:
+            return hash_r6(password, salt, udata)
+        return hashlib.sha256(password + salt + udata).digest()
+
+    def check(self, candidate: str) -> int:
+        password = encode_aes_password(candidate)
+        if self._hash(password, self.o_salt, self.u48) == self.o_hash:
+            return OWNER_PASSWORD
+        if self._hash(password, self.u_salt, b"") == self.u_hash:
+            return USER_PASSWORD
+        return NOT_DECRYPTED
+
+
+# ──── PUBLIC API ────────────────────────────────────────────────────────────
+def _make_checker(params: EncryptParams):
+    if params.revision >= 5:
+        return _AesV3Checker(params)
+    return _LegacyChecker(params)
+
+
+def _check_chunk(params: EncryptParams, candidates: Sequence[str]) -> List[int]:
+    checker = _make_checker(params)
+    return [checker.check(candidate) for candidate in candidates]
+
+
+def _chunks(items: Sequence[str], count: int) -> List[Sequence[str]]:
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def check_passwords(
+    params: EncryptParams,
+    candidates: Iterable[str],
+    processes: Optional[int] = None,
+) -> List[int]:
+    """
+    Check every candidate and return one result per candidate:
+    OWNER_PASSWORD, USER_PASSWORD or NOT_DECRYPTED (same codes as decrypt()).
+
+    Key derivation for R3, R4 and R6 is CPU-bound, so large batches for those
+    revisions are spread over ``processes`` worker processes (default: all
+    CPUs; 1 disables this).
+    """
+    candidates = list(candidates)
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if (params.revision not in PARALLEL_REVISIONS or processes <= 1
+            or len(candidates) < PARALLEL_MIN_CANDIDATES):
+        return _check_chunk(params, candidates)
+
+    chunks = _chunks(candidates, processes * 4)
+    results: List[int] = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for chunk_result in pool.map(_check_chunk, [params] * len(chunks), chunks):
+            results.extend(chunk_result)
+    return results
+
+
+def _first_match(candidates: Sequence[str], results: Iterable[int]) -> Optional[Tuple[str, int]]:
+    for candidate, result in zip(candidates, results):
+        if result != NOT_DECRYPTED:
+            return candidate, result
+    return None
+
+
+def find_password(
+    params: EncryptParams,
+    candidates: Iterable[str],
+    processes: Optional[int] = None,
+) -> Optional[Tuple[str, int]]:
+    """
+    Return (password, result) for the first matching candidate, or None.
+    Stops at the first match: later candidates (or chunks not yet started
+    in worker processes) are never checked.
+    """
+    candidates = list(candidates)
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if (params.revision not in PARALLEL_REVISIONS or processes <= 1
+            or len(candidates) < PARALLEL_MIN_CANDIDATES):
+        checker = _make_checker(params)
+        return _first_match(candidates, (checker.check(candidate) for candidate in candidates))
+
+    chunks = iter(candidates[i:i + SEARCH_CHUNK_SIZE] for i in range(0, len(candidates), SEARCH_CHUNK_SIZE))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        in_flight: Deque[Tuple[Sequence[str], Future]] = deque()
+
+        def submit_next() -> None:
+            for chunk in chunks:
+                in_flight.append((chunk, pool.submit(_check_chunk, params, chunk)))
+                return
+
+        for _ in range(processes):
+            submit_next()
+        # Waiting on chunks in list order keeps "first match" meaning first in
+        # the candidate list; on a match only the chunks in flight still finish
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            match = _first_match(chunk, future.result())
+            if match:
+                return match
+            submit_next()
+    return None
+
+
+# ──── COMMAND LINE ──────────────────────────────────────────────────────────
+def add_password_arguments(parser: argparse.ArgumentParser) -> None:
+    """Candidate password options, shared by the batch tools."""
+    parser.add_argument("--password", action="append",
+                        help="password to try (repeat for several candidates)")
+    parser.add_argument("--password-file", help="file with one candidate password per line")
+
+
+def load_passwords(args: argparse.Namespace) -> List[str]:
+    """Candidates from add_password_arguments() options: every --password, then the file's lines."""
+    passwords = list(args.password or [])
+    if args.password_file:
+        with open(args.password_file, encoding="utf-8") as f:
+            passwords.extend(line.rstrip("\r\n") for line in f if line.strip())
+    return passwords
@@ -0,0 +1,271 @@
+# pdf_encrypt.py
+# Re-Encryption on Write ──────────────────────────────────────────────────────
+# Apply a new password and permission set in the same PdfReader → PdfWriter
+# pass that removes the old one. The file key is derived once per document
+# and each object is encrypted as it is written, so re-securing costs no
+# second parse or write.
+#
+# PyPDF2's own PdfWriter.encrypt() only offers RC4, encrypts with a pure-Python
+# RC4, and has no AES-256; EncryptingPdfWriter adds AES-256 (V5/R6) and uses
+# PyCryptodome for both.
+
+import argparse
+import codecs
+import os
+import struct
+from dataclasses import dataclass
+from hashlib import md5
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from PyPDF2 import PdfWriter
+from PyPDF2.errors import DependencyError
+from PyPDF2.generic import (
+    ArrayObject,
+    ByteStringObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+    TextStringObject,
+    encode_pdfdocencoding,
+)
+
+from password_check import HAS_CRYPTODOME, encode_aes_password, hash_r6
+
+if HAS_CRYPTODOME:
+    from Crypto.Cipher import AES, ARC4
+    from Crypto.Util.Padding import pad
+else:
+    from PyPDF2._security import RC4_encrypt
+
+# ──── CONSTANTS ─────────────────────────────────────────────────────────────
+ALGORITHM_AES_256 = "AES-256"
+ALGORITHM_RC4_128 = "RC4-128"
+ALGORITHMS = (ALGORITHM_AES_256, ALGORITHM_RC4_128)
+
+# Permission name → bit number (1-based) of the /P entry
+PERMISSION_BITS = {
+    "print": 3,
+    "modify": 4,
+    "copy": 5,
+    "annotate": 6,
+    "fill-forms": 9,
+    "accessibility": 10,
+    "assemble": 11,
+    "print-high": 12,
+}
+# Bits 7–8 and 13–32 are reserved and must be 1
+_P_RESERVED = 0xFFFFF0C0
+
+# Object encryptor: plaintext bytes → ciphertext bytes
+Cipher = Callable[[bytes], bytes]
+
+
+def parse_permissions(spec: str) -> List[str]:
+    """Turn "print, copy" (or "all" / "none") into a list of permission names."""
+    spec = spec.strip().lower()
+    if spec == "all":
+        return list(PERMISSION_BITS)
+    if spec in ("", "none"):
+        return []
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PERMISSION_BITS]
+    if unknown:
+        raise ValueError(
+            f"Unknown permission(s) {', '.join(unknown)} (use {', '.join(PERMISSION_BITS)}, all or none)"
+        )
+    return names
+
+
+def permissions_flag(permissions: Optional[Sequence[str]]) -> int:
+    """The signed 32-bit /P value granting ``permissions`` (None grants everything)."""
+    names = PERMISSION_BITS if permissions is None else permissions
+    flag = _P_RESERVED
+    for name in names:
+        flag |= 1 << (PERMISSION_BITS[name] - 1)
+    return struct.unpack("<i", struct.pack("<I", flag))[0]
+
+
+@dataclass
+class EncryptionOptions:
+    """
+    How to re-secure an output. An empty ``user_password`` lets anyone open the
+    file while ``owner_password`` guards the ``permissions`` (None = all).
+    """
+
+    user_password: str
+    owner_password: Optional[str] = None
+    permissions: Optional[List[str]] = None
+    algorithm: str = ALGORITHM_AES_256
+
+    def __post_init__(self) -> None:
+        if self.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown encryption algorithm '{self.algorithm}' (use {', '.join(ALGORITHMS)})")
+        if not self.user_password and not self.owner_password:
+            raise ValueError("Set a user password, an owner password, or both")
+
+
+def add_encryption_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command-line options for re-securing outputs, shared by the batch tools."""
+    group = parser.add_argument_group("re-secure outputs")
+    group.add_argument("--encrypt-password", help="new user (open) password for every output")
+    group.add_argument("--owner-password", help="new owner password (default: the user password)")
+    group.add_argument("--permissions", type=parse_permissions,
+                       help=f"granted permissions: all, none, or a list of {', '.join(PERMISSION_BITS)}")
+    group.add_argument("--algorithm", choices=ALGORITHMS, default=ALGORITHM_AES_256)
+
+
+def encryption_from_args(args: argparse.Namespace) -> Optional[EncryptionOptions]:
+    """EncryptionOptions from add_encryption_arguments() options, or None to leave outputs open."""
+    if args.encrypt_password is None and args.owner_password is None and args.permissions is None:
+        return None
+    return EncryptionOptions(args.encrypt_password or "", args.owner_password, args.permissions, args.algorithm)
+
+
+# ──── OBJECT ENCRYPTION ─────────────────────────────────────────────────────
+def _text_bytes(text: TextStringObject) -> bytes:
+    # Same encoding TextStringObject.write_to_stream uses
+    try:
+        return encode_pdfdocencoding(text)
+    except UnicodeEncodeError:
+        return codecs.BOM_UTF16_BE + text.encode("utf-16be")
+
+
+def _encrypt_object(obj: PdfObject, cipher: Cipher) -> PdfObject:
+    """Copy of ``obj`` with every string and stream encrypted; names and numbers stay clear."""
+    if isinstance(obj, TextStringObject):
+        return ByteStringObject(cipher(_text_bytes(obj)))
+    if isinstance(obj, ByteStringObject):
+        return ByteStringObject(cipher(bytes(obj)))
+    if isinstance(obj, StreamObject):
+        encrypted = DecodedStreamObject()
+        for key, value in obj.items():
+            encrypted[key] = _encrypt_object(value, cipher)
+        encrypted._data = cipher(obj._data)
+        return encrypted
+    if isinstance(obj, DictionaryObject):
+        encrypted_dict = DictionaryObject()
+        for key, value in obj.items():
+            encrypted_dict[key] = _encrypt_object(value, cipher)
+        return encrypted_dict
+    if isinstance(obj, ArrayObject):
+        return ArrayObject(_encrypt_object(item, cipher) for item in obj)
+    return obj
+
+
+def _rc4(key: bytes) -> Cipher:
+    if HAS_CRYPTODOME:
+        return lambda data: ARC4.new(key).encrypt(data)
+    return lambda data: RC4_encrypt(key, data)
+
+
+def _aes_256(key: bytes) -> Cipher:
+    # Algorithm 1.A: fresh random IV per string/stream, prepended to the ciphertext
+    def encrypt(data: bytes) -> bytes:
+        iv = os.urandom(16)
+        return iv + AES.new(key, AES.MODE_CBC, iv).encrypt(pad(data, 16))
+
+    return encrypt
+
+
+# ──── WRITER ────────────────────────────────────────────────────────────────
+class EncryptingPdfWriter(PdfWriter):
+    """
+    PdfWriter that encrypts its output per ``options``. The key is derived in
+    the constructor; objects are encrypted one at a time as they are written.
+    """
+
+    def __init__(self, options: EncryptionOptions) -> None:
+        super().__init__()
+        self.encryption = options
+        user_password = options.user_password
+        owner_password = options.owner_password or user_password
+        flag = permissions_flag(options.permissions)
+
+        if options.algorithm == ALGORITHM_AES_256:
+            if not HAS_CRYPTODOME:
+                raise DependencyError("PyCryptodome is required for AES algorithm")
+            self._file_key = os.urandom(32)
+            encrypt = self._aes_256_dictionary(user_password, owner_password, flag)
+            self._encrypt = self._add_object(encrypt)
+            self._ID = ArrayObject((ByteStringObject(os.urandom(16)), ByteStringObject(os.urandom(16))))
+            # AES-256 is a PDF 2.0 / Adobe extension level 8 feature
+            self.pdf_header = b"%PDF-1.7"
+            self._root_object[NameObject("/Extensions")] = DictionaryObject({
+                NameObject("/ADBE"): DictionaryObject({
+                    NameObject("/BaseVersion"): NameObject("/1.7"),
+                    NameObject("/ExtensionLevel"): NumberObject(8),
+                }),
+            })
+        else:
+            # PyPDF2 derives the RC4 key, /O, /U and /ID; only the writing is ours
+            self.encrypt(user_password, owner_password, use_128bit=True, permissions_flag=flag)
+            self._file_key = self._encrypt_key
+
+    def _aes_256_dictionary(self, user_password: str, owner_password: str, flag: int) -> DictionaryObject:
+        """Algorithms 8–10 (revision 6): /U, /UE, /O, /OE and /Perms for the file key."""
+        user = encode_aes_password(user_password)
+        owner = encode_aes_password(owner_password)
+        key = self._file_key
+
+        def wrap(password: bytes, salt: bytes, udata: bytes) -> bytes:
+            kek = hash_r6(password, salt, udata)
+            return AES.new(kek, AES.MODE_CBC, bytes(16)).encrypt(key)
+
+        u_validation, u_key_salt = os.urandom(8), os.urandom(8)
+        u = hash_r6(user, u_validation, b"") + u_validation + u_key_salt
+        ue = wrap(user, u_key_salt, b"")
+        o_validation, o_key_salt = os.urandom(8), os.urandom(8)
+        o = hash_r6(owner, o_validation, u) + o_validation + o_key_salt
+        oe = wrap(owner, o_key_salt, u)
+        perms = AES.new(key, AES.MODE_ECB).encrypt(
+            struct.pack("<i", flag) + b"\xff\xff\xff\xffTadb" + os.urandom(4)
+        )
+
+        std_cf = DictionaryObject({
+            NameObject("/AuthEvent"): NameObject("/DocOpen"),
+            NameObject("/CFM"): NameObject("/AESV3"),
+            NameObject("/Length"): NumberObject(32),
+        })
+        entries: Dict[str, Any] = {
+            "/Filter": NameObject("/Standard"),
+            "/V": NumberObject(5),
+            "/R": NumberObject(6),
+            "/Length": NumberObject(256),
+            "/CF": DictionaryObject({NameObject("/StdCF"): std_cf}),
+            "/StmF": NameObject("/StdCF"),
+            "/StrF": NameObject("/StdCF"),
+            "/O": ByteStringObject(o),
+            "/U": ByteStringObject(u),
+            "/OE": ByteStringObject(oe),
+            "/UE": ByteStringObject(ue),
+            "/P": NumberObject(flag),
+            "/Perms": ByteStringObject(perms),
+        }
+        return DictionaryObject({NameObject(k): v for k, v in entries.items()})
+
+    def _object_cipher(self, idnum: int) -> Cipher:
+        if self.encryption.algorithm == ALGORITHM_AES_256:
+            # Revision 6 uses the file key itself for every object
+            return _aes_256(self._file_key)
+        # Algorithm 1: per-object RC4 key from the file key, object and generation number
+        object_key = md5(self._file_key + struct.pack("<i", idnum)[:3] + b"\x00\x00").digest()
+        return _rc4(object_key[: min(16, len(self._file_key) + 5)])
+
+    def _write_header(self, stream: Any) -> List[int]:
+        # Same layout as PdfWriter._write_header, with our own object encryption
+        object_positions = []
+        stream.write(self.pdf_header + b"\n")
+        stream.write(b"%\xE2\xE3\xCF\xD3\n")
+        for idnum, obj in enumerate(self._objects, 1):
+            if obj is None:
+                continue
+            object_positions.append(stream.tell())
+            stream.write(f"{idnum} 0 obj\n".encode())
+            if idnum != self._encrypt.idnum:
+                obj = _encrypt_object(obj, self._object_cipher(idnum))
+            obj.write_to_stream(stream, None)
+            stream.write(b"\nendobj\n")
+        return object_positions
@@ -0,0 +1,257 @@
+# unlocker.py
+# Unlock Core ─────────────────────────────────────────────────────────────────
+# The PdfReader → PdfWriter pass shared by the Streamlit app and batch tools.
+
+import bisect
+import gc
+import os
+import time
+import uuid
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import IndirectObject, NameObject
+
+from password_check import NOT_DECRYPTED, encode_password, find_password, params_from_reader
+from pdf_encrypt import EncryptingPdfWriter, EncryptionOptions
+
+# Called after each page is copied: on_page(done, total)
+PageCallback = Callable[[int, int], None]
+
+# Page attributes a page inherits from its ancestors in the page tree
+_INHERITABLE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def get_generated_filename(original_name: str, suffix: str = "unlocked") -> str:
+    """Generate clean output filename."""
+    base, ext = os.path.splitext(original_name)
+    return f"{base} - {suffix}{ext}"
+
+
+def unique_output_names(inputs: Sequence[str], suffix: str = "unlocked") -> List[str]:
+    """
+    Output filenames for ``inputs``, one per input and all distinct: inputs
+    sharing a basename get " (1)", " (2)", … in input order.
+    """
+    seen: Dict[str, int] = {}
+    names = []
+    for src in inputs:
+        name = get_generated_filename(os.path.basename(src), suffix)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        if count:
+            base, ext = os.path.splitext(name)
+            name = f"{base} ({count}){ext}"
+        names.append(name)
+    return names
+
+
+def parse_page_selection(spec: str, total_pages: int) -> List[int]:
+    """
+    Turn a 1-based selection like "1-5, 120, 300-310" into 0-based page indices,
+    in the order given and without duplicates. An empty spec selects every page.
+    """
+    if not spec or not spec.strip():
+        return list(range(total_pages))
+
+    indices: List[int] = []
+    seen = set()
+    for part in spec.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        try:
+            start = int(first) if first.strip() else 1
+            end = (int(last) if last.strip() else total_pages) if sep else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: '{part}'") from None
+        if start < 1 or end > total_pages or start > end:
+            raise ValueError(f"Page range '{part}' is outside 1–{total_pages}")
+        for index in range(start - 1, end):
+            if index not in seen:
+                seen.add(index)
+                indices.append(index)
+
+    if not indices:
+        raise ValueError("No pages selected")
+    return indices
+
+
+def count_pages(reader: PdfReader) -> int:
+    """Page count from the page tree root's /Count, without loading any page."""
+    try:
+        return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except (KeyError, TypeError, ValueError):
+        return len(reader.pages)
+
+
+def get_pages(reader: PdfReader, indices: Sequence[int]) -> List[PageObject]:
+    """
+    Load the pages at ``indices`` (returned in that order) in one walk of the
+    page tree. Subtrees without a requested page are skipped by their /Count
+    and the walk stops after the last requested page; ``reader.pages`` instead
+    loads and decrypts every page dictionary in the document.
+    """
+    wanted = sorted(set(indices))
+    if not wanted:
+        return []
+    found: Dict[int, PageObject] = {}
+
+    def walk(node: Any, first: int, inherited: Dict[str, Any]) -> None:
+        inherited = dict(inherited)
+        for attr in _INHERITABLE_ATTRIBUTES:
+            if attr in node:
+                inherited[attr] = node[attr]
+        position = first
+        for kid_ref in node["/Kids"]:
+            if position > wanted[-1]:
+                return
+            kid = kid_ref.get_object()
+            if kid.get("/Type") == "/Pages" or "/Kids" in kid:
+                count = int(kid["/Count"])
+                # Descend only if some requested index falls in [position, position + count)
+                next_wanted = bisect.bisect_left(wanted, position)
+                if next_wanted < len(wanted) and wanted[next_wanted] < position + count:
+                    walk(kid, position, inherited)
+                position += count
+            else:
+                if position in wanted_set:
+                    page = PageObject(reader, kid_ref if isinstance(kid_ref, IndirectObject) else None)
+                    page.update(kid)
+                    for attr, value in inherited.items():
+                        if attr not in page:
+                            page[NameObject(attr)] = value
+                    found[position] = page
+                position += 1
+
+    wanted_set = set(wanted)
+    walk(reader.trailer["/Root"]["/Pages"].get_object(), 0, {})
+    missing = wanted_set.difference(found)
+    if missing:
+        raise IndexError(f"Page {min(missing) + 1} not found in the page tree")
+    return [found[index] for index in indices]
+
+
+def get_page(reader: PdfReader, index: int) -> PageObject:
+    """Load one page without loading the rest of the page tree (see get_pages)."""
+    return get_pages(reader, [index])[0]
+
+
+class WrongPasswordError(ValueError):
+    """None of the supplied passwords opens the document."""
+
+
+def decrypt_reader(
+    reader: PdfReader, passwords: Sequence[str], processes: Optional[int] = None
+) -> int:
+    """
+    Decrypt ``reader`` with the first matching password.
+    Returns 1 (user) or 2 (owner) like PdfReader.decrypt(), or 0 if not encrypted.
+    ``processes`` caps the processes used to check many candidates (see find_password).
+    """
+    if not reader.is_encrypted:
+        return NOT_DECRYPTED
+    params = params_from_reader(reader)
+    if len(passwords) == 1:
+        result = reader.decrypt(encode_password(params, passwords[0]))
+    else:
+        match = find_password(params, passwords, processes)
+        result = reader.decrypt(encode_password(params, match[0])) if match else NOT_DECRYPTED
+    if result == NOT_DECRYPTED:
+        raise WrongPasswordError("Decryption failed — incorrect password.")
+    return int(result)
+
+
+def _get_pages_or_flatten(reader: PdfReader, indices: Sequence[int]) -> List[PageObject]:
+    try:
+        return get_pages(reader, indices)
+    except (KeyError, IndexError, TypeError, ValueError):
+        # Malformed page tree (e.g. wrong /Count): let PyPDF2 flatten it
+        return [reader.pages[index] for index in indices]
+
+
+def build_unlocked_writer(
+    reader: PdfReader,
+    on_page: Optional[PageCallback] = None,
+    page_indices: Optional[Sequence[int]] = None,
+    encryption: Optional[EncryptionOptions] = None,
+) -> PdfWriter:
+    """
+    Copy the selected pages (default: all) and metadata of a decrypted reader
+    into a new writer. Only objects reachable from those pages are decrypted
+    and written; page dictionaries are read up to the last selected page.
+    With ``encryption``, the writer re-secures the output as it is written.
+    """
+    writer = EncryptingPdfWriter(encryption) if encryption else PdfWriter()
+    if page_indices is not None and list(page_indices) == list(range(count_pages(reader))):
+        # Every page in order: PyPDF2's own flattening is the cheapest way to get them
+        page_indices = None
+    if page_indices is None:
+        pages: Iterable[PageObject] = reader.pages
+        total_pages = max(1, len(reader.pages))
+    else:
+        pages = _get_pages_or_flatten(reader, page_indices)
+        total_pages = max(1, len(page_indices))
+    for i, page in enumerate(pages, 1):
+        writer.add_page(page)
+        if on_page:
+            on_page(i, total_pages)
+
+    try:
+        writer.add_metadata(reader.metadata or {})
+    except Exception:
+        pass
+    return writer
+
+
+def unlock_file(
+    src: Union[str, BinaryIO],
+    dst: str,
+    passwords: Sequence[str],
+    pages: Optional[str] = None,
+    encryption: Optional[EncryptionOptions] = None,
+    processes: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Unlock ``src`` into ``dst``, keeping only ``pages`` (e.g. "1-5, 120") if given,
+    and re-securing it per ``encryption`` if given. ``processes`` is passed to
+    decrypt_reader(); callers already running in a pool should pass 1.
+    The output is written to a uniquely named temporary file (removed on
+    failure) and moved into place only when complete, so ``dst`` never holds
+    a partial PDF.
+    """
+    start_time = time.time()
+    reader = PdfReader(src)
+    password_type = decrypt_reader(reader, passwords, processes)
+    total_pages = count_pages(reader)
+    page_indices = parse_page_selection(pages or "", total_pages)
+    writer = build_unlocked_writer(reader, page_indices=page_indices, encryption=encryption)
+
+    # A temp name of our own: several processes may be writing the same ``dst``
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            writer.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # PyPDF2 readers/writers hold reference cycles; free this document now so a
+    # long batch in one process doesn't keep every previous one alive
+    del reader, writer
+    gc.collect()
+
+    return {
+        "pages": len(page_indices),
+        "total_pages": total_pages,
+        "password_type": password_type,
+        "bytes_out": os.path.getsize(dst),
+        "elapsed": time.time() - start_time,
+    }
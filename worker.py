@@ -0,0 +1,109 @@
+# worker.py
+# Unlock Worker ───────────────────────────────────────────────────────────────
+# Pulls jobs from a job_queue.JobQueue directory and writes results to its
+# content-addressed store. Run as many as you like on the host that holds the
+# directory; throughput scales with the number of workers up to its CPUs.
+#
+#   python worker.py --queue /srv/pdf-unlocker
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from PyPDF2 import PdfReader
+
+from job_queue import LEASE_SECONDS, JobQueue
+from unlocker import count_pages, decrypt_reader, parse_page_selection, unlock_file
+
+POLL_INTERVAL_S = 0.5
+# How often a worker deletes expired jobs and results (see JobQueue.cleanup)
+CLEANUP_INTERVAL_S = 60
+# Running jobs renew their lease this often, well inside LEASE_SECONDS
+HEARTBEAT_INTERVAL_S = LEASE_SECONDS / 4
+
+
+@contextmanager
+def heartbeat(root: str, job_id: str, worker_id: str) -> Iterator[None]:
+    """Renew the job's lease from a background thread while the body runs."""
+    stop = threading.Event()
+
+    def beat() -> None:
+        # SQLite connections can't be shared across threads; use one of our own
+        with JobQueue(root) as queue:
+            while not stop.wait(HEARTBEAT_INTERVAL_S):
+                queue.renew(job_id, worker_id)
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process_job(queue: JobQueue, job: dict) -> None:
+    src = queue.input_path(job["input_hash"])
+    dst = queue.result_path(job["result_key"])
+    passwords = [job["password"] or ""]
+
+    if queue.has_result(job["result_key"]):
+        # Same input and pages already unlocked: only check this job's password
+        start_time = time.time()
+        reader = PdfReader(src)
+        decrypt_reader(reader, passwords)
+        total_pages = count_pages(reader)
+        queue.complete(job["job_id"], {
+            "elapsed": time.time() - start_time,
+            "pages": len(parse_page_selection(job["pages"] or "", total_pages)),
+            "total_pages": total_pages,
+            "bytes_out": os.path.getsize(dst),
+        })
+        return
+
+    # Workers racing on the same key each write their own uniquely named .part
+    # file; the last os.replace() wins and both results are identical
+    stats = unlock_file(src, dst, passwords, job["pages"])
+    queue.complete(job["job_id"], stats)
+
+
+def run_worker(root: str, worker_id: str, once: bool = False) -> None:
+    with JobQueue(root) as queue:
+        next_cleanup = 0.0
+        while True:
+            if time.time() >= next_cleanup:
+                queue.cleanup()
+                next_cleanup = time.time() + CLEANUP_INTERVAL_S
+            job = queue.claim(worker_id)
+            if job is None:
+                if once:
+                    return
+                time.sleep(POLL_INTERVAL_S)
+                continue
+            try:
+                with heartbeat(root, job["job_id"], worker_id):
+                    process_job(queue, job)
+                print(f"done  {job['job_id']} ({job['filename']})")
+            except Exception as e:
+                queue.fail(job["job_id"], f"{type(e).__name__}: {e}")
+                print(f"fail  {job['job_id']} ({job['filename']}): {e}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Process PDF unlock jobs from a shared queue directory.")
+    parser.add_argument("--queue", required=True, help="shared queue directory")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+
+    run_worker(args.queue, args.worker_id, args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# zip_stream.py
+# Streaming ZIP Output ────────────────────────────────────────────────────────
+# Return many unlocked PDFs as one ZIP without holding the archive (or more
+# than one output per worker) in memory. Each PDF is appended as soon as its
+# worker finishes, stored as-is (PDF streams are already compressed), and the
+# archive bytes are streamed to a file or client chunk by chunk.
+#
+#   python zip_stream.py reports/*.pdf --password secret --zip unlocked.zip
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from password_check import add_password_arguments, load_passwords
+from pdf_encrypt import EncryptionOptions, add_encryption_arguments, encryption_from_args
+from unlocker import unique_output_names, unlock_file
+
+# ──── CONSTANTS ─────────────────────────────────────────────────────────────
+COPY_CHUNK_SIZE = 1_048_576
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands written bytes to a consumer."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+def _stored_info(path: str, arcname: str) -> zipfile.ZipInfo:
+    # file_size is known up front, so zipfile picks ZIP64 headers when needed
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.compress_type = zipfile.ZIP_STORED
+    return info
+
+
+def iter_zip(entries: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of ``(path, arcname)`` entries as byte chunks, e.g. as
+    an HTTP response body. Entries are consumed lazily, so they can be
+    produced while the archive is being sent.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for path, arcname in entries:
+            with open(path, "rb") as src, archive.open(_stored_info(path, arcname), "w") as dst:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                    dst.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def write_zip(entries: Iterable[Tuple[str, str]], fileobj: BinaryIO) -> None:
+    """Write a ZIP archive of ``(path, arcname)`` entries to an open binary file."""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_STORED) as archive:
+        for path, arcname in entries:
+            with open(path, "rb") as src, archive.open(_stored_info(path, arcname), "w") as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+# ──── UNLOCK → ZIP ──────────────────────────────────────────────────────────
+def _unlock_to_temp(
+    src: str,
+    tmp_dir: str,
+    index: int,
+    passwords: Sequence[str],
+    pages: Optional[str],
+    encryption: Optional[EncryptionOptions],
+) -> Tuple[str, Dict]:
+    dst = os.path.join(tmp_dir, f"{index:06d}.pdf")
+    # Already one of ``workers`` pool processes: don't start a password-check pool per file
+    return dst, unlock_file(src, dst, passwords, pages, encryption, processes=1)
+
+
+def iter_unlocked(
+    inputs: Sequence[str],
+    passwords: Sequence[str],
+    workers: Optional[int] = None,
+    errors: Optional[List[Tuple[str, str]]] = None,
+    pages: Optional[str] = None,
+    encryption: Optional[EncryptionOptions] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Unlock ``inputs`` in worker processes and yield ``(temp_path, arcname)``
+    in completion order. Only ``workers`` jobs are in flight at once and each
+    temp file is deleted once the consumer moves on, so disk and memory use
+    don't grow with the batch. Failures are appended to ``errors`` (if given)
+    instead of stopping the batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    arcnames = unique_output_names(inputs, "secured" if encryption else "unlocked")
+    pending = iter(enumerate(inputs))
+    with tempfile.TemporaryDirectory(prefix="unlock-zip-") as tmp_dir, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+
+        def submit_next() -> None:
+            for i, src in pending:
+                in_flight[pool.submit(_unlock_to_temp, src, tmp_dir, i, list(passwords), pages, encryption)] = i
+                return
+
+        for _ in range(workers):
+            submit_next()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = in_flight.pop(future)
+                submit_next()
+                try:
+                    tmp_path, _ = future.result()
+                except Exception as e:
+                    if errors is None:
+                        raise
+                    errors.append((inputs[i], f"{type(e).__name__}: {e}"))
+                    continue
+                try:
+                    yield tmp_path, arcnames[i]
+                finally:
+                    os.remove(tmp_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Unlock many PDFs into one streamed ZIP archive.")
+    parser.add_argument("inputs", nargs="+", help="PDF files")
+    parser.add_argument("--zip", required=True, help="output ZIP path, or - for stdout")
+    add_password_arguments(parser)
+    parser.add_argument("--pages", help='pages to keep in every file, e.g. "1-5, 120"')
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    add_encryption_arguments(parser)
+    args = parser.parse_args()
+
+    passwords = load_passwords(args)
+    if not passwords:
+        parser.error("give at least one --password or a --password-file")
+    try:
+        encryption = encryption_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    errors: List[Tuple[str, str]] = []
+    entries = iter_unlocked(args.inputs, passwords, args.workers, errors, args.pages, encryption)
+    if args.zip == "-":
+        for chunk in iter_zip(entries):
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.zip, "wb") as out:
+            write_zip(entries, out)
+
+    for src, error in errors:
+        print(f"fail  {src}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())